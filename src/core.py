@@ -5,9 +5,12 @@ Monitor any URL/endpoint for changes, send alerts on detection
 """
 
 import json
+import atexit
+import queue
 import hashlib
 import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
 import smtplib
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -15,12 +18,94 @@ from typing import Optional, Dict, List
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import time
+import heapq
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
 from enum import Enum
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
+
+# Change-detection fingerprints need speed, not collision resistance against
+# an adversary: prefer BLAKE3 when installed, else stdlib SHA-256 (hardware
+# accelerated on CPUs with SHA extensions, where it beats BLAKE2b)
+try:
+    from blake3 import blake3 as _hasher
+    HASH_ALGO = "blake3"
+except ImportError:
+    _hasher = hashlib.sha256
+    HASH_ALGO = "sha256"
+
+# Snapshots are stored compressed; zstd when available, else stdlib gzip
+try:
+    import zstandard
+    _compress = zstandard.ZstdCompressor(level=3).compress
+    SNAPSHOT_SUFFIX = ".html.zst"
+except ImportError:
+    import gzip
+    _compress = partial(gzip.compress, compresslevel=6)
+    SNAPSHOT_SUFFIX = ".html.gz"
+
+# Selector checks need lxml (with cssselect); without it they fall back to
+# whole-page checks
+try:
+    import lxml.html
+    import lxml.cssselect  # noqa: F401  (backs HtmlElement.cssselect)
+except ImportError:
+    lxml = None
 
 CONFIG_DIR = Path.home() / ".config" / "dataspy"
 DATA_DIR = Path.home() / ".local" / "share" / "dataspy"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+CHUNK_SIZE = 4096  # window size for per-chunk content digests
+DIGEST_SIZE = 32
+MIN_CHECK_INTERVAL = 1  # seconds; keeps interval-0 tasks from busy-polling
+
+# Hot-path statements; identical text lets sqlite3 reuse the prepared statement
+_SQL_INSERT_SNAP = '''
+    INSERT INTO snapshots (id, task_id, content_hash, content_path)
+    VALUES (?, ?, ?, ?)
+'''
+_SQL_INSERT_EVENT = '''
+    INSERT INTO events (id, task_id, timestamp, change_type, old_value, new_value, diff_summary)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+# Column order matches the MonitorTask fields
+_SQL_SELECT_TASKS = '''
+    SELECT id, name, url, check_type, selector, json_path, check_interval,
+           last_check_epoch, last_content_hash, last_value, enabled, created_at_epoch,
+           fingerprint
+    FROM tasks
+'''
+_SQL_SELECT_EVENTS = '''
+    SELECT id, task_id, timestamp, change_type, old_value, new_value, diff_summary
+    FROM events
+'''
+_SQL_UPDATE_TASK = '''
+    UPDATE tasks SET 
+        last_check_epoch = ?, last_content_hash = ?, last_value = ?, fingerprint = ?
+    WHERE id = ?
+'''
+_SQL_TOUCH_TASK = "UPDATE tasks SET last_check_epoch = ? WHERE id = ?"
+
+# Fields that define what a task monitors; changing any of them invalidates
+# the stored hashes and validators
+_TARGET_FIELDS = ("url", "check_type", "selector", "json_path")
+_SAME_TARGET = " AND ".join(f"{field} IS excluded.{field}" for field in _TARGET_FIELDS)
+_SQL_UPSERT_TASK = f'''
+    INSERT INTO tasks 
+    (id, name, url, check_type, selector, json_path, check_interval, enabled, created_at_epoch)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name, url = excluded.url, check_type = excluded.check_type,
+        selector = excluded.selector, json_path = excluded.json_path,
+        check_interval = excluded.check_interval, enabled = excluded.enabled,
+        last_content_hash = CASE WHEN {_SAME_TARGET} THEN last_content_hash END,
+        last_value = CASE WHEN {_SAME_TARGET} THEN last_value END,
+        fingerprint = CASE WHEN {_SAME_TARGET} THEN fingerprint END
+'''
 
 class ChangeType(Enum):
     CONTENT_CHANGED = "content_changed"
@@ -39,15 +124,96 @@ class MonitorTask:
     selector: Optional[str] = None  # CSS selector for targeted monitoring
     json_path: Optional[str] = None  # JSON path for API monitoring
     check_interval: int = 3600  # seconds
-    last_check: Optional[datetime] = None
+    last_check_epoch: Optional[int] = None  # epoch seconds
     last_content_hash: Optional[str] = None
     last_value: Optional[str] = None
     enabled: bool = True
-    created_at: datetime = None
+    created_at_epoch: Optional[int] = None  # epoch seconds
+    # Persisted together as the tasks.fingerprint blob
+    etag: Optional[str] = None  # validators for conditional GET
+    last_modified: Optional[str] = None
+    chunk_digests: Optional[bytes] = None  # concatenated per-chunk digests
+    hash_algo: Optional[str] = None  # algorithm behind the stored hashes
     
     def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now()
+        if self.created_at_epoch is None:
+            self.created_at_epoch = int(time.time())
+    
+    # Timestamps are kept as epoch seconds; datetimes are only built on access
+    @property
+    def last_check(self) -> Optional[datetime]:
+        if self.last_check_epoch is None:
+            return None
+        return datetime.fromtimestamp(self.last_check_epoch)
+    
+    @last_check.setter
+    def last_check(self, value: Optional[datetime]):
+        self.last_check_epoch = int(value.timestamp()) if value else None
+    
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at_epoch)
+
+class ChunkHasher:
+    """Streaming hasher that keeps one digest per fixed-size window of the body.
+    
+    The page hash is the hash of the digest list, so two fetches can be
+    compared window by window to see which regions changed.
+    """
+    
+    def __init__(self, window: int = CHUNK_SIZE):
+        self.window = window
+        self.digests: List[bytes] = []
+        self.total = 0
+        self._buffer = bytearray()
+    
+    def update(self, data: bytes):
+        self.total += len(data)
+        self._buffer += data
+        end = len(self._buffer) - len(self._buffer) % self.window
+        if end:
+            view = memoryview(self._buffer)
+            for start in range(0, end, self.window):
+                self.digests.append(_hasher(view[start:start + self.window]).digest())
+            view.release()
+            del self._buffer[:end]
+    
+    def finalize(self) -> bytes:
+        """Flush the trailing partial window and return the packed digests."""
+        if self._buffer:
+            self.digests.append(_hasher(self._buffer).digest())
+            self._buffer.clear()
+        return b''.join(self.digests)
+    
+    def hexdigest(self) -> str:
+        return _hasher(self.finalize()).hexdigest()
+
+def count_changed_chunks(old: bytes, new: bytes) -> int:
+    """Number of chunk positions whose digest differs between two fetches."""
+    old_count, new_count = len(old) // DIGEST_SIZE, len(new) // DIGEST_SIZE
+    changed = abs(old_count - new_count)
+    for offset in range(0, min(old_count, new_count) * DIGEST_SIZE, DIGEST_SIZE):
+        if old[offset:offset + DIGEST_SIZE] != new[offset:offset + DIGEST_SIZE]:
+            changed += 1
+    return changed
+
+def pack_fingerprint(etag: Optional[str], last_modified: Optional[str],
+                     hash_algo: Optional[str], chunk_digests: Optional[bytes]) -> bytes:
+    """Pack a task's fetch validators and chunk digests into one blob.
+    
+    Layout: a one-line JSON header, a newline, then the raw digest bytes.
+    """
+    header = {"etag": etag, "last_modified": last_modified, "hash_algo": hash_algo}
+    return json.dumps(header).encode() + b"\n" + (chunk_digests or b"")
+
+def unpack_fingerprint(blob: Optional[bytes]) -> Dict:
+    """Inverse of pack_fingerprint, as MonitorTask keyword arguments."""
+    if not blob:
+        return {}
+    header, _, digests = bytes(blob).partition(b"\n")
+    fields = json.loads(header)
+    fields["chunk_digests"] = digests or None
+    return fields
 
 @dataclass
 class ChangeEvent:
@@ -64,16 +230,63 @@ class DataSpyCore:
     def __init__(self):
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
         DATA_DIR.mkdir(parents=True, exist_ok=True)
-        (DATA_DIR / "snapshots").mkdir(exist_ok=True)
+        self._db_path_str = str(DATA_DIR / "dataspy.db")
+        self._snapshots_dir = DATA_DIR / "snapshots"
+        self._snapshots_dir.mkdir(exist_ok=True)
         self.init_database()
         self.tasks: Dict[str, MonitorTask] = {}
         self.load_tasks()
+        
+        # Min-heap of (next_check_epoch, task_id); _next_check holds the live
+        # entry per task so superseded heap entries can be skipped lazily
+        self._schedule: List[tuple] = []
+        self._next_check: Dict[str, float] = {}
+        for task in self.tasks.values():
+            self._schedule_task(task)
+        
+        # Shared HTTP session: keep-alive connections are reused across polls
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # check_type -> checker, resolved once; unknown types check the full page
+        self._checkers = {'full_page': self._check_full_page}
+        if lxml is not None:
+            self._checkers['selector'] = self._check_selector
+        
+        # Fetches are network-bound, so due tasks are checked in parallel
+        self.executor = ThreadPoolExecutor(max_workers=16)
+        
+        # Snapshot files are compressed and written off the check path;
+        # None on the queue stops the writer
+        self._snap_queue: queue.Queue = queue.Queue()
+        self._snap_writer = threading.Thread(target=self._snapshot_writer, daemon=True)
+        self._snap_writer.start()
+        self._closed = False
+        atexit.register(self.close)
+    
+    def close(self):
+        """Flush pending snapshot writes and release resources."""
+        if self._closed:
+            return
+        self._closed = True
+        self.executor.shutdown(wait=True)
+        self._snap_queue.put(None)
+        self._snap_writer.join()
+        self.session.close()
+        self.conn.close()
     
     def init_database(self):
         """Initialize SQLite database."""
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
+        # One connection for the lifetime of the core, shared across threads
+        self.conn = sqlite3.connect(
+            self._db_path_str, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        self._db_lock = threading.Lock()
+        self._pending_writes: Optional[Dict[str, List[tuple]]] = None
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS tasks (
@@ -84,14 +297,32 @@ class DataSpyCore:
                 selector TEXT,
                 json_path TEXT,
                 check_interval INTEGER DEFAULT 3600,
-                last_check TIMESTAMP,
+                last_check TIMESTAMP,  -- legacy ISO timestamps, superseded by *_epoch
                 last_content_hash TEXT,
                 last_value TEXT,
                 enabled BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_check_epoch INTEGER,
+                created_at_epoch INTEGER,
+                fingerprint BLOB
             )
         ''')
         
+        # Upgrade databases created before the columns above existed
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(tasks)")}
+        for column, column_type in (("last_check_epoch", "INTEGER"),
+                                    ("created_at_epoch", "INTEGER"),
+                                    ("fingerprint", "BLOB")):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE tasks ADD COLUMN {column} {column_type}")
+        if "last_check_epoch" not in columns:
+            # Legacy timestamps were written with datetime.now(), i.e. local time
+            cursor.execute('''
+                UPDATE tasks SET
+                    last_check_epoch = CAST(strftime('%s', last_check, 'utc') AS INTEGER),
+                    created_at_epoch = CAST(strftime('%s', created_at, 'utc') AS INTEGER)
+            ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS events (
                 id TEXT PRIMARY KEY,
@@ -116,58 +347,112 @@ class DataSpyCore:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # get_events filters by task and orders by time; snapshots are per task
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_task_ts ON events(task_id, timestamp DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_task ON snapshots(task_id)")
+        
+        # WAL + NORMAL sync: one fsync per checkpoint instead of two per write.
+        # Snapshots can be re-fetched, so NORMAL durability is sufficient.
+        self.conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-20000;
+        ''')
+    
+    @contextmanager
+    def _batched_writes(self):
+        """Queue writes made inside the block and apply them in one short
+        transaction when it ends, so the write lock is never held across
+        network I/O.
+        
+        Each task's writes go under their own savepoint, so a failing row
+        only drops that task's results. Yields a list that holds the ids of
+        those tasks once the block has exited.
+        """
+        failed: List[str] = []
+        with self._db_lock:
+            self._pending_writes = {}
+        try:
+            yield failed
+        finally:
+            with self._db_lock:
+                pending, self._pending_writes = self._pending_writes, None
+                if pending:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        for task_id, writes in pending.items():
+                            self.conn.execute("SAVEPOINT task_writes")
+                            try:
+                                for sql, group in groupby(writes, key=itemgetter(0)):
+                                    self.conn.executemany(sql, [params for _, params in group])
+                            except sqlite3.Error as e:
+                                self.conn.execute("ROLLBACK TO task_writes")
+                                print(f"Error saving task {task_id}: {e}")
+                                failed.append(task_id)
+                            self.conn.execute("RELEASE task_writes")
+                    except BaseException:
+                        self.conn.execute("ROLLBACK")
+                        raise
+                    self.conn.execute("COMMIT")
+    
+    def _write(self, task_id: str, sql: str, params: tuple):
+        """Execute a write now, or queue it under its task while a batch is open."""
+        with self._db_lock:
+            if self._pending_writes is not None:
+                self._pending_writes.setdefault(task_id, []).append((sql, params))
+            else:
+                self.conn.execute(sql, params)
     
     def load_tasks(self):
         """Load tasks from database."""
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM tasks")
-        rows = cursor.fetchall()
-        
-        for row in rows:
-            task = MonitorTask(
-                id=row[0],
-                name=row[1],
-                url=row[2],
-                check_type=row[3],
-                selector=row[4],
-                json_path=row[5],
-                check_interval=row[6],
-                last_check=datetime.fromisoformat(row[7]) if row[7] else None,
-                last_content_hash=row[8],
-                last_value=row[9],
-                enabled=bool(row[10]),
-                created_at=datetime.fromisoformat(row[11]) if row[11] else datetime.now()
-            )
-            self.tasks[task.id] = task
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            cursor.execute(_SQL_SELECT_TASKS)
+            rows = cursor.fetchall()
         
-        conn.close()
+        self.tasks.update((row[0], self._task_from_row(row)) for row in rows)
+    
+    def _reload_task(self, task_id: str):
+        """Replace a task's in-memory state with what the database holds."""
+        with self._db_lock:
+            row = self.conn.execute(_SQL_SELECT_TASKS + "WHERE id = ?", (task_id,)).fetchone()
+        if row:
+            self.tasks[task_id] = self._task_from_row(row)
+    
+    @staticmethod
+    def _task_from_row(row: tuple) -> MonitorTask:
+        """Build a task from a _SQL_SELECT_TASKS row."""
+        return MonitorTask(*row[:10], bool(row[10]), row[11], **unpack_fingerprint(row[12]))
     
     def add_task(self, task: MonitorTask) -> Dict:
         """Add a new monitoring task."""
         # Save to database
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO tasks 
-            (id, name, url, check_type, selector, json_path, check_interval, enabled, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            task.id, task.name, task.url, task.check_type,
-            task.selector, task.json_path, task.check_interval,
-            task.enabled, task.created_at.isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            # Upsert rather than REPLACE: an existing row is updated in place,
+            # keeping created_at, and its monitoring state unless the target changed
+            cursor.execute(_SQL_UPSERT_TASK, (
+                task.id, task.name, task.url, task.check_type,
+                task.selector, task.json_path, task.check_interval,
+                task.enabled, task.created_at_epoch
+            ))
         
+        existing = self.tasks.get(task.id)
+        if existing:
+            # Mirror the state the upsert preserved
+            task.created_at_epoch = existing.created_at_epoch
+            task.last_check_epoch = existing.last_check_epoch
+            if all(getattr(existing, field) == getattr(task, field) for field in _TARGET_FIELDS):
+                task.last_content_hash = existing.last_content_hash
+                task.last_value = existing.last_value
+                task.etag = existing.etag
+                task.last_modified = existing.last_modified
+                task.chunk_digests = existing.chunk_digests
+                task.hash_algo = existing.hash_algo
         self.tasks[task.id] = task
+        self._schedule_task(task)
         return {"success": True, "task_id": task.id}
     
     def check_task(self, task_id: str) -> Optional[ChangeEvent]:
@@ -177,144 +462,273 @@ class DataSpyCore:
             return None
         
         try:
-            # Fetch content
-            response = requests.get(task.url, timeout=30, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            checker = self._checkers.get(task.check_type, self._check_full_page)
+            return checker(task)
+        except Exception as e:
+            print(f"Error checking task {task_id}: {e}")
+            return None
+    
+    def _fetch(self, task: MonitorTask, hasher: Optional[ChunkHasher] = None):
+        """Fetch a task's URL, feeding the body to `hasher` as it streams in.
+        
+        Returns (now, chunks, etag, last_modified), or None when the server
+        answered 304 Not Modified (last_check is updated in that case).
+        """
+        # Let the server tell us when nothing changed since the last fetch
+        headers = {}
+        if task.last_content_hash:
+            if task.etag:
+                headers['If-None-Match'] = task.etag
+            if task.last_modified:
+                headers['If-Modified-Since'] = task.last_modified
+        
+        chunks = []
+        with self.session.get(task.url, timeout=30, stream=True, headers=headers) as response:
+            now = datetime.now()
+            if response.status_code == 304:
+                # Nothing to download, hash or snapshot; only last_check moves
+                task.last_check = now
+                self._touch_task_in_db(task)
+                return None
             response.raise_for_status()
-            content = response.text
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if hasher:
+                    hasher.update(chunk)
+                chunks.append(chunk)
+            return now, chunks, response.headers.get('ETag'), response.headers.get('Last-Modified')
+    
+    def _check_full_page(self, task: MonitorTask) -> Optional[ChangeEvent]:
+        """Detect changes anywhere in the page body."""
+        # Hash the raw body as it streams in; it is never decoded to text
+        hasher = ChunkHasher()
+        fetched = self._fetch(task, hasher)
+        if fetched is None:
+            return None
+        now, chunks, etag, last_modified = fetched
+        
+        content_hash = hasher.hexdigest()
+        chunk_digests = hasher.finalize()
+        previous_digests = task.chunk_digests or b''
+        comparable = task.hash_algo == HASH_ALGO
+        task.etag = etag
+        task.last_modified = last_modified
+        task.chunk_digests = chunk_digests
+        task.hash_algo = HASH_ALGO
+        
+        # Check for changes (hashes made by another algorithm are not
+        # comparable, so those tasks are silently re-baselined)
+        if (task.last_content_hash and comparable
+                and task.last_content_hash != content_hash):
+            # Content changed
+            changed = count_changed_chunks(previous_digests, chunk_digests)
+            # Chunks added or removed count as changed, so compare against the larger side
+            chunk_count = max(len(previous_digests), len(chunk_digests)) // DIGEST_SIZE
+            event = ChangeEvent(
+                id=f"evt_{int(now.timestamp())}_{task.id}",
+                task_id=task.id,
+                timestamp=now,
+                change_type=ChangeType.CONTENT_CHANGED,
+                old_value=task.last_content_hash[:16] + "...",
+                new_value=content_hash[:16] + "...",
+                diff_summary=f"Content changed ({hasher.total} bytes, "
+                             f"{changed}/{chunk_count} chunks)"
+            )
             
-            # Calculate hash
-            content_hash = hashlib.sha256(content.encode()).hexdigest()
+            # Save snapshot
+            self._save_snapshot(task.id, now, b''.join(chunks), content_hash)
             
-            # Check for changes
-            if task.last_content_hash and task.last_content_hash != content_hash:
-                # Content changed
-                event = ChangeEvent(
-                    id=f"evt_{int(time.time())}_{task_id}",
-                    task_id=task_id,
-                    timestamp=datetime.now(),
-                    change_type=ChangeType.CONTENT_CHANGED,
-                    old_value=task.last_content_hash[:16] + "...",
-                    new_value=content_hash[:16] + "...",
-                    diff_summary=f"Content changed ({len(content)} bytes)"
-                )
-                
-                # Save snapshot
-                self._save_snapshot(task_id, content, content_hash)
-                
-                # Update task
-                task.last_content_hash = content_hash
-                task.last_check = datetime.now()
-                self._update_task_in_db(task)
-                
-                # Save event
-                self._save_event(event)
-                
-                return event
-            else:
-                # No change, just update last_check
-                task.last_check = datetime.now()
-                self._update_task_in_db(task)
-                return None
-                
-        except Exception as e:
-            print(f"Error checking task {task_id}: {e}")
+            # Update task
+            task.last_content_hash = content_hash
+            task.last_check = now
+            self._update_task_in_db(task)
+            
+            # Save event
+            self._save_event(event)
+            
+            return event
+        else:
+            # No change (or first check), record the baseline hash
+            task.last_content_hash = content_hash
+            task.last_check = now
+            self._update_task_in_db(task)
             return None
     
-    def _save_snapshot(self, task_id: str, content: str, content_hash: str):
-        """Save content snapshot."""
-        snapshot_id = f"snap_{int(time.time())}_{task_id}"
-        snapshot_path = DATA_DIR / "snapshots" / f"{snapshot_id}.html"
-        snapshot_path.write_text(content)
+    def _check_selector(self, task: MonitorTask) -> Optional[ChangeEvent]:
+        """Detect changes in the text of the elements matching task.selector.
         
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO snapshots (id, task_id, content_hash, content_path)
-            VALUES (?, ?, ?, ?)
-        ''', (snapshot_id, task_id, content_hash, str(snapshot_path)))
-        conn.commit()
-        conn.close()
+        Only the selected text is hashed, so edits elsewhere on the page
+        are ignored. Tasks without a selector get a full-page check.
+        """
+        if not task.selector:
+            return self._check_full_page(task)
+        
+        fetched = self._fetch(task)
+        if fetched is None:
+            return None
+        now, chunks, etag, last_modified = fetched
+        
+        body = b''.join(chunks)
+        # lxml refuses to parse an empty document
+        nodes = lxml.html.fromstring(body).cssselect(task.selector) if body.strip() else []
+        value = "\n".join(node.text_content().strip() for node in nodes)
+        content_hash = _hasher(value.encode()).hexdigest()
+        comparable = task.hash_algo == HASH_ALGO
+        old_value = task.last_value
+        task.etag = etag
+        task.last_modified = last_modified
+        task.chunk_digests = None
+        task.hash_algo = HASH_ALGO
+        
+        if (task.last_content_hash and comparable
+                and task.last_content_hash != content_hash):
+            event = ChangeEvent(
+                id=f"evt_{int(now.timestamp())}_{task.id}",
+                task_id=task.id,
+                timestamp=now,
+                change_type=ChangeType.CONTENT_CHANGED,
+                old_value=old_value,
+                new_value=value,
+                diff_summary=f"Selection changed ({len(nodes)} elements, {len(value)} chars)"
+            )
+            self._save_snapshot(task.id, now, body, content_hash)
+            task.last_content_hash = content_hash
+            task.last_value = value
+            task.last_check = now
+            self._update_task_in_db(task)
+            self._save_event(event)
+            return event
+        
+        task.last_content_hash = content_hash
+        task.last_value = value
+        task.last_check = now
+        self._update_task_in_db(task)
+        return None
+    
+    def _save_snapshot(self, task_id: str, now: datetime, body: bytes, content_hash: str):
+        """Save content snapshot.
+        
+        The file is named by a hash of the raw body whatever the checker, so
+        identical pages always share a file; `content_hash` is whatever the
+        checker compared.
+        """
+        snapshot_id = f"snap_{int(now.timestamp())}_{task_id}"
+        body_hash = _hasher(body).hexdigest()
+        # Content-addressed: identical pages share one compressed file
+        snapshot_path = self._snapshots_dir / f"{body_hash}{SNAPSHOT_SUFFIX}"
+        if not snapshot_path.exists():
+            self._snap_queue.put((snapshot_path, snapshot_id, body))
+        
+        self._write(task_id, _SQL_INSERT_SNAP, (snapshot_id, task_id, content_hash, str(snapshot_path)))
+    
+    def _snapshot_writer(self):
+        """Background thread: compress and write queued snapshot files."""
+        while True:
+            item = self._snap_queue.get()
+            if item is None:
+                break
+            snapshot_path, snapshot_id, body = item
+            try:
+                if not snapshot_path.exists():
+                    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{snapshot_id}.tmp")
+                    tmp_path.write_bytes(_compress(body))
+                    tmp_path.replace(snapshot_path)
+            except Exception as e:
+                print(f"Error writing snapshot {snapshot_path.name}: {e}")
     
     def _save_event(self, event: ChangeEvent):
         """Save change event to database."""
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO events (id, task_id, timestamp, change_type, old_value, new_value, diff_summary)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        self._write(event.task_id, _SQL_INSERT_EVENT, (
             event.id, event.task_id, event.timestamp.isoformat(),
             event.change_type.value, event.old_value, event.new_value, event.diff_summary
         ))
-        conn.commit()
-        conn.close()
     
     def _update_task_in_db(self, task: MonitorTask):
         """Update task in database."""
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE tasks SET 
-                last_check = ?, last_content_hash = ?, last_value = ?
-            WHERE id = ?
-        ''', (
-            task.last_check.isoformat() if task.last_check else None,
+        self._write(task.id, _SQL_UPDATE_TASK, (
+            task.last_check_epoch,
             task.last_content_hash,
             task.last_value,
+            pack_fingerprint(task.etag, task.last_modified, task.hash_algo, task.chunk_digests),
             task.id
         ))
-        conn.commit()
-        conn.close()
+    
+    def _touch_task_in_db(self, task: MonitorTask):
+        """Record only a new last_check for an unchanged task."""
+        self._write(task.id, _SQL_TOUCH_TASK, (task.last_check_epoch, task.id))
     
     def run_monitor(self, interval: int = 60):
         """Main monitoring loop."""
         print(f"DataSpy monitor started (check interval: {interval}s)")
         while True:
-            for task_id, task in self.tasks.items():
-                if not task.enabled:
-                    continue
-                
-                # Check if it's time to check this task
-                if task.last_check:
-                    time_since_check = (datetime.now() - task.last_check).total_seconds()
-                    if time_since_check < task.check_interval:
-                        continue
+            due = self._pop_due_tasks(time.time())
+            if due:
+                # Fetch without holding the write lock; the sweep's writes
+                # are then committed together
+                try:
+                    with self._batched_writes() as failed:
+                        events = list(self.executor.map(self.check_task, due))
+                except sqlite3.Error as e:
+                    print(f"Error saving sweep results: {e}")
+                    failed = due
+                # Unsaved results must not linger in memory; reloading the
+                # stored state lets the next check detect them again
+                for task_id in failed:
+                    self._reload_task(task_id)
                 
-                # Check the task
-                event = self.check_task(task_id)
-                if event:
-                    print(f"🚨 CHANGE DETECTED: {task.name}")
-                    print(f"   {event.diff_summary}")
-                    # TODO: Send notification
-                else:
-                    print(f"✓ {task.name} - no change")
+                for task_id, event in zip(due, events):
+                    task = self.tasks[task_id]
+                    if task_id in failed:
+                        print(f"✗ {task.name} - results not saved, will retry")
+                    elif event:
+                        print(f"🚨 CHANGE DETECTED: {task.name}")
+                        print(f"   {event.diff_summary}")
+                        # TODO: Send notification
+                    else:
+                        print(f"✓ {task.name} - no change")
+                    self._schedule_task(task, time.time() + max(task.check_interval, MIN_CHECK_INTERVAL))
             
-            time.sleep(interval)
+            # Sleep until the next task is due, waking at least every `interval`
+            delay = interval
+            if self._schedule:
+                delay = min(delay, max(0, self._schedule[0][0] - time.time()))
+            time.sleep(delay)
+    
+    def _schedule_task(self, task: MonitorTask, when: Optional[float] = None):
+        """Queue a task's next check; disabled tasks are dropped from the schedule."""
+        if not task.enabled:
+            self._next_check.pop(task.id, None)
+            return
+        if when is None:
+            interval = max(task.check_interval, MIN_CHECK_INTERVAL)
+            when = task.last_check_epoch + interval if task.last_check_epoch else 0
+        self._next_check[task.id] = when
+        heapq.heappush(self._schedule, (when, task.id))
+    
+    def _pop_due_tasks(self, now: float) -> List[str]:
+        """Pop every task whose next check is at or before `now`."""
+        due = []
+        while self._schedule and self._schedule[0][0] <= now:
+            when, task_id = heapq.heappop(self._schedule)
+            if self._next_check.get(task_id) == when:
+                del self._next_check[task_id]
+                due.append(task_id)
+        return due
     
     def get_events(self, task_id: Optional[str] = None, limit: int = 50) -> List[ChangeEvent]:
         """Get change events."""
-        db_path = DATA_DIR / "dataspy.db"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        
-        if task_id:
-            cursor.execute(
-                "SELECT * FROM events WHERE task_id = ? ORDER BY timestamp DESC LIMIT ?",
-                (task_id, limit)
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM events ORDER BY timestamp DESC LIMIT ?",
-                (limit,)
-            )
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            if task_id:
+                cursor.execute(
+                    _SQL_SELECT_EVENTS + "WHERE task_id = ? ORDER BY timestamp DESC LIMIT ?",
+                    (task_id, limit)
+                )
+            else:
+                cursor.execute(
+                    _SQL_SELECT_EVENTS + "ORDER BY timestamp DESC LIMIT ?",
+                    (limit,)
+                )
+            rows = cursor.fetchall()
         
         events = []
         for row in rows:
@@ -325,7 +739,7 @@ class DataSpyCore:
                 change_type=ChangeType(row[3]),
                 old_value=row[4],
                 new_value=row[5],
-                diff_summary=row[6] if len(row) > 6 else ""
+                diff_summary=row[6] or ""
             ))
         return events
 